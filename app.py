@@ -3,11 +3,12 @@ import os
 import tempfile
 import streamlit as st
 
-from utils.transcribe import transcribe_audio
+from utils.transcribe import available_cpu_count, transcribe_audio
 from utils.openai_transcribe import transcribe_audio_openai
 from utils.summarize import generate_notes
 from utils.actions import extract_action_items
 from utils.formatting import to_markdown
+from utils.text import split_sentences
 from utils.notion_export import export_to_notion_database
 from utils.gdocs_export import export_to_google_doc
 
@@ -41,6 +42,17 @@ st.markdown("""
 
 st.title("📝 Voice Memo → Notes")
 
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_notes(transcript: str):
+    """Summary and action items for a transcript, cached across reruns."""
+    # Split once and share between the summarizer and the action extractor
+    sentences = split_sentences(transcript)
+    notes = generate_notes(transcript, sentences=sentences)
+    actions = extract_action_items(transcript, sentences=sentences)
+    return notes, actions
+
+
 with st.container():
     st.markdown('<div class="card">', unsafe_allow_html=True)
 
@@ -73,6 +85,22 @@ with st.container():
         language = st.selectbox("Language", ["en", "auto"], index=0)
         st.caption("Tip: small is a great default. medium is slower but can be more accurate.")
 
+        with st.expander("Advanced", expanded=False):
+            cpu_threads = st.number_input(
+                "CPU threads",
+                min_value=0,
+                max_value=available_cpu_count(),
+                value=0,
+                help="Threads used by local transcription. 0 uses all available CPU cores. "
+                     "Changing this reloads the model.",
+            )
+            share_cores = st.checkbox(
+                "Share cores between concurrent sessions",
+                value=False,
+                help="With CPU threads at 0, split the cores so two transcriptions can run at once "
+                     "without oversubscribing the CPU.",
+            )
+
     st.markdown('</div>', unsafe_allow_html=True)
 
 st.divider()
@@ -91,40 +119,63 @@ if generate and audio_file is not None:
         st.stop()
     
     with st.spinner("Processing audio…"):
-        # Save uploaded file to temp
-        suffix = os.path.splitext(audio_file.name)[1].lower() or ".m4a"
-        fd, temp_path = tempfile.mkstemp(suffix=suffix)
-        os.close(fd)
-        with open(temp_path, "wb") as f:
-            f.write(audio_file.getbuffer())
-
-        try:
-            # Transcribe using selected method
-            lang = None if language == "auto" else language
-            
-            if transcribe_method == "OpenAI (Faster)":
-                transcript, detected_lang = transcribe_audio_openai(temp_path, api_key=openai_key, language=lang)
-            else:
-                transcript, detected_lang = transcribe_audio(temp_path, model_size=model_size, language=lang)
-        except Exception as e:
-            st.error(f"Transcription failed: {str(e)}")
+        # Transcribe using selected method
+        lang = None if language == "auto" else language
+
+        if transcribe_method == "OpenAI (Faster)":
+            # Upload straight from memory; no temp file needed
+            try:
+                transcript, detected_lang = transcribe_audio_openai(
+                    audio_file, audio_file.name, api_key=openai_key, language=lang
+                )
+            except Exception as e:
+                st.error(f"Transcription failed: {str(e)}")
+                st.stop()
+        else:
+            # Save uploaded file to temp for local decoding
+            suffix = os.path.splitext(audio_file.name)[1].lower() or ".m4a"
+            fd, temp_path = tempfile.mkstemp(suffix=suffix)
+            os.close(fd)
+            with open(temp_path, "wb") as f:
+                f.write(audio_file.getbuffer())
+
+            try:
+                transcript, detected_lang = transcribe_audio(
+                    temp_path,
+                    model_size=model_size,
+                    language=lang,
+                    cpu_threads=int(cpu_threads) or None,
+                    share_cores=share_cores,
+                )
+            except Exception as e:
+                st.error(f"Transcription failed: {str(e)}")
+                try:
+                    os.remove(temp_path)
+                except Exception:
+                    pass
+                st.stop()
+
             try:
                 os.remove(temp_path)
             except Exception:
                 pass
-            st.stop()
-
-        try:
-            os.remove(temp_path)
-        except Exception:
-            pass
 
     if not transcript.strip():
         st.error("No transcript was produced. Try a clearer audio file or a larger model.")
         st.stop()
 
-    notes = generate_notes(transcript)
-    actions = extract_action_items(transcript)
+    # Keep the result so later reruns (export buttons, title edits) still render it
+    st.session_state["file_id"] = audio_file.file_id
+    st.session_state["transcript"] = transcript
+    st.session_state["detected_lang"] = detected_lang
+
+# Only show results for the file that is currently uploaded
+if audio_file is not None and st.session_state.get("file_id") == audio_file.file_id:
+    transcript = st.session_state["transcript"]
+    detected_lang = st.session_state["detected_lang"]
+
+    notes, actions = _build_notes(transcript)
+    # Cheap string join; kept out of the cache so title edits don't miss it
     md = to_markdown(title=title, transcript=transcript, notes=notes, action_items=actions)
 
     st.success(f"Done. Detected language: {detected_lang}")
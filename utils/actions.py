@@ -1,6 +1,8 @@
 from __future__ import annotations
 import re
-from typing import List
+from typing import List, Optional
+
+from utils.text import split_sentences
 
 ACTION_PATTERNS = [
     r"\bI need to\b",
@@ -27,24 +29,28 @@ ACTION_PATTERNS = [
     r"\bFinish\b",
 ]
 
-# Simple sentence splitter
-_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_ACTION_RE = re.compile("|".join(ACTION_PATTERNS), re.IGNORECASE)
 
 
-def extract_action_items(transcript: str, max_items: int = 12) -> List[str]:
-    sentences = [s.strip() for s in _SENT_SPLIT.split(transcript) if s.strip()]
+def extract_action_items(
+    transcript: str,
+    max_items: int = 12,
+    sentences: Optional[List[str]] = None,
+) -> List[str]:
+    # Callers that already split the transcript can pass the sentences in
+    if sentences is None:
+        sentences = split_sentences(transcript)
     hits = []
 
     for s in sentences:
-        s_norm = s.lower()
-        if any(re.search(pat.lower(), s_norm) for pat in ACTION_PATTERNS):
+        if _ACTION_RE.search(s):
             hits.append(s)
 
     # Deduplicate while preserving order
     deduped = []
     seen = set()
     for x in hits:
-        key = re.sub(r"\s+", " ", x.lower())
+        key = " ".join(x.lower().split())
         if key not in seen:
             deduped.append(x)
             seen.add(key)
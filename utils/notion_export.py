@@ -1,8 +1,34 @@
 from __future__ import annotations
 from typing import List, Dict, Optional
+import time
 from notion_client import Client
+from notion_client.errors import HTTPResponseError
 from datetime import datetime
 
+# Notion accepts at most 100 child blocks per request
+MAX_BLOCKS_PER_REQUEST = 100
+_MAX_RETRIES = 5
+
+
+def _with_backoff(call, *args, **kwargs):
+    """
+    Run a Notion API call, retrying only when rate limited (429).
+    Creates and appends aren't idempotent, so other errors are raised rather than
+    retried - a gateway error may come back after the write was applied.
+    """
+    for attempt in range(_MAX_RETRIES + 1):
+        try:
+            return call(*args, **kwargs)
+        except HTTPResponseError as e:
+            if e.status != 429 or attempt == _MAX_RETRIES:
+                raise
+            try:
+                delay = float(e.headers.get("Retry-After"))
+            except (TypeError, ValueError):
+                delay = 0.5 * 2 ** attempt
+            time.sleep(delay)
+
+
 def export_to_notion_database(
     notion_token: str,
     database_id: str,
@@ -22,32 +48,43 @@ def export_to_notion_database(
 
     # Notion block text limit ~2000 chars per rich_text item; keep chunks smaller
     def chunk_text(text: str, chunk_size: int = 1800):
-        return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
+        return (text[i:i+chunk_size] for i in range(0, len(text), chunk_size))
 
     action_text = "\n".join([f"- {x}" for x in action_items]) if action_items else "(none)"
 
-    page = client.pages.create(
+    blocks = [
+        {
+            "object": "block",
+            "type": "heading_2",
+            "heading_2": {"rich_text": [{"type": "text", "text": {"content": "Notes"}}]},
+        },
+        *(
+            {
+                "object": "block",
+                "type": "paragraph",
+                "paragraph": {"rich_text": [{"type": "text", "text": {"content": chunk}}]},
+            }
+            for chunk in chunk_text(markdown_body)
+        ),
+    ]
+
+    page = _with_backoff(
+        client.pages.create,
         parent={"database_id": database_id},
         properties={
             "Name": {"title": [{"text": {"content": title}}]},
             "Date": {"date": {"start": datetime.utcnow().isoformat()}},
             "Action Items": {"rich_text": [{"text": {"content": action_text[:1900]}}]},
         },
-        children=[
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {"rich_text": [{"type": "text", "text": {"content": "Notes"}}]},
-            },
-            *[
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {"rich_text": [{"type": "text", "text": {"content": chunk}}]},
-                }
-                for chunk in chunk_text(markdown_body)
-            ],
-        ],
+        children=blocks[:MAX_BLOCKS_PER_REQUEST],
     )
 
+    # Append the remaining blocks one request at a time so the body keeps its order
+    for i in range(MAX_BLOCKS_PER_REQUEST, len(blocks), MAX_BLOCKS_PER_REQUEST):
+        _with_backoff(
+            client.blocks.children.append,
+            block_id=page["id"],
+            children=blocks[i:i + MAX_BLOCKS_PER_REQUEST],
+        )
+
     return page.get("url", "")
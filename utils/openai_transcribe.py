@@ -1,10 +1,41 @@
 from __future__ import annotations
-from typing import Tuple, Optional
+import os
+from typing import BinaryIO, Tuple, Optional
 from openai import OpenAI
 
+VALID_FORMATS = frozenset({
+    'mp3', 'mp4', 'mpeg', 'mpga', 'wma', 'wav', 'webm', 'm4a', 'aac', 'flac', 'ogg',
+})
+
+# verbose_json reports the language as Whisper's English name ("english");
+# map it to the ISO code faster-whisper reports so both backends match
+_LANGUAGE_CODES = {
+    "english": "en", "chinese": "zh", "german": "de", "spanish": "es", "russian": "ru",
+    "korean": "ko", "french": "fr", "japanese": "ja", "portuguese": "pt", "turkish": "tr",
+    "polish": "pl", "catalan": "ca", "dutch": "nl", "arabic": "ar", "swedish": "sv",
+    "italian": "it", "indonesian": "id", "hindi": "hi", "finnish": "fi", "vietnamese": "vi",
+    "hebrew": "he", "ukrainian": "uk", "greek": "el", "malay": "ms", "czech": "cs",
+    "romanian": "ro", "danish": "da", "hungarian": "hu", "tamil": "ta", "norwegian": "no",
+    "thai": "th", "urdu": "ur", "croatian": "hr", "bulgarian": "bg", "lithuanian": "lt",
+    "latin": "la", "maori": "mi", "malayalam": "ml", "welsh": "cy", "slovak": "sk",
+    "telugu": "te", "persian": "fa", "latvian": "lv", "bengali": "bn", "serbian": "sr",
+    "azerbaijani": "az", "slovenian": "sl", "kannada": "kn", "estonian": "et", "macedonian": "mk",
+    "breton": "br", "basque": "eu", "icelandic": "is", "armenian": "hy", "nepali": "ne",
+    "mongolian": "mn", "bosnian": "bs", "kazakh": "kk", "albanian": "sq", "swahili": "sw",
+    "galician": "gl", "marathi": "mr", "punjabi": "pa", "sinhala": "si", "khmer": "km",
+    "shona": "sn", "yoruba": "yo", "somali": "so", "afrikaans": "af", "occitan": "oc",
+    "georgian": "ka", "belarusian": "be", "tajik": "tg", "sindhi": "sd", "gujarati": "gu",
+    "amharic": "am", "yiddish": "yi", "lao": "lo", "uzbek": "uz", "faroese": "fo",
+    "haitian creole": "ht", "pashto": "ps", "turkmen": "tk", "nynorsk": "nn", "maltese": "mt",
+    "sanskrit": "sa", "luxembourgish": "lb", "myanmar": "my", "tibetan": "bo", "tagalog": "tl",
+    "malagasy": "mg", "assamese": "as", "tatar": "tt", "hawaiian": "haw", "lingala": "ln",
+    "hausa": "ha", "bashkir": "ba", "javanese": "jw", "sundanese": "su", "cantonese": "yue",
+}
+
 
 def transcribe_audio_openai(
-    audio_path: str,
+    audio_file: BinaryIO,
+    filename: str,
     api_key: str,
     language: Optional[str] = "en",
 ) -> Tuple[str, str]:
@@ -12,7 +43,8 @@ def transcribe_audio_openai(
     Transcribe audio using OpenAI's Whisper API.
     
     Args:
-        audio_path: Path to audio file
+        audio_file: Binary file-like object with the audio (e.g. a Streamlit upload)
+        filename: Original file name, used to determine the audio format
         api_key: OpenAI API key
         language: Language code (en, es, etc.) or None for auto-detection
         
@@ -25,31 +57,25 @@ def transcribe_audio_openai(
     client = OpenAI(api_key=api_key)
     
     # Determine file format
-    valid_formats = ['mp3', 'mp4', 'mpeg', 'mpga', 'wma', 'wav', 'webm', 'm4a', 'aac', 'flac', 'ogg']
-    file_format = audio_path.split('.')[-1].lower()
+    file_format = os.path.splitext(filename)[1][1:].lower()
     
-    if file_format not in valid_formats:
-        raise ValueError(f"Unsupported audio format: {file_format}. Supported: {', '.join(valid_formats)}")
+    if file_format not in VALID_FORMATS:
+        raise ValueError(f"Unsupported audio format: {file_format}. Supported: {', '.join(sorted(VALID_FORMATS))}")
     
-    with open(audio_path, 'rb') as audio_file:
-        # OpenAI Whisper API call
-        if language and language != "auto":
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language=language,
-                response_format="json"
-            )
-        else:
-            # Let API auto-detect language
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="json"
-            )
+    # Stream the file object as-is; the SDK takes the name from the tuple
+    audio_file.seek(0)
+    upload = (filename, audio_file)
+
+    # OpenAI Whisper API call; verbose_json includes the detected language.
+    # Language is only sent when fixed, otherwise the API auto-detects it.
+    kwargs = {"model": "whisper-1", "file": upload, "response_format": "verbose_json"}
+    if language and language != "auto":
+        kwargs["language"] = language
+    transcript = client.audio.transcriptions.create(**kwargs)
     
     text = transcript.text
-    # OpenAI doesn't return detected language, so we return a placeholder
-    detected_lang = language if language and language != "auto" else "unknown"
+    # Report only what the API detected; never echo back the requested language
+    api_lang = (getattr(transcript, "language", None) or "").strip().lower()
+    detected_lang = _LANGUAGE_CODES.get(api_lang, api_lang) or "unknown"
     
     return text, detected_lang
@@ -1,8 +1,8 @@
 from __future__ import annotations
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+from utils.text import split_sentences
 
 KEYWORDS = [
     "goal", "plan", "strategy", "important", "priority", "deadline",
@@ -10,15 +10,22 @@ KEYWORDS = [
     "metric", "kpi", "revenue", "customer", "pipeline", "follow up"
 ]
 
+HEDGES = ["i think", "maybe", "kind of"]
+
+# Zero-width lookahead so overlapping keywords ("riskpi") are all found;
+# no keyword is a prefix of another, so one capture per position suffices
+_KW_RE = re.compile(
+    "(?=(" + "|".join(re.escape(kw) for kw in KEYWORDS) + "))", re.IGNORECASE
+)
+_HEDGE_RE = re.compile("|".join(re.escape(h) for h in HEDGES), re.IGNORECASE)
+
 
 def _score_sentence(s: str) -> int:
-    s_l = s.lower()
     score = 0
     score += min(len(s) // 40, 3)  # prefer medium-length informative sentences
-    for kw in KEYWORDS:
-        if kw in s_l:
-            score += 2
-    if any(x in s_l for x in ["i think", "maybe", "kind of"]):
+    # Each distinct keyword counts once, however often it appears
+    score += 2 * len({m.lower() for m in _KW_RE.findall(s)})
+    if _HEDGE_RE.search(s):
         score -= 1
     return score
 
@@ -27,20 +34,24 @@ def generate_notes(
     transcript: str,
     max_summary_bullets: int = 10,
     max_key_points: int = 6,
+    sentences: Optional[List[str]] = None,
 ) -> Dict[str, List[str]]:
-    sentences = [s.strip() for s in _SENT_SPLIT.split(transcript) if s.strip()]
+    # Callers that already split the transcript can pass the sentences in
+    if sentences is None:
+        sentences = split_sentences(transcript)
     if not sentences:
         return {"summary": [], "key_points": [], "questions": []}
 
     ranked = sorted(sentences, key=_score_sentence, reverse=True)
 
     summary = ranked[:max_summary_bullets]
+    summary_set = set(summary)
 
     questions = [s for s in sentences if s.endswith("?")][:6]
 
     key_points = [
         s for s in ranked
-        if s not in summary
+        if s not in summary_set
     ][:max_key_points]
 
     return {
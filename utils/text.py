@@ -0,0 +1,10 @@
+from __future__ import annotations
+import re
+from typing import List
+
+# Simple sentence splitter
+SENT_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_sentences(transcript: str) -> List[str]:
+    return [s.strip() for s in SENT_SPLIT.split(transcript) if s.strip()]
@@ -1,193 +1,179 @@
 from __future__ import annotations
 import os
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Optional
 
 import av
-from faster_whisper import WhisperModel
+import numpy as np
+import soundfile as sf
+import streamlit as st
+from faster_whisper import BatchedInferencePipeline, WhisperModel
 
+SAMPLE_RATE = 16000
+# Containers libsndfile can read without a transcode
+_SOUNDFILE_EXTS = (".wav", ".flac")
+# Concurrent transcriptions the shared model can serve
+NUM_WORKERS = 2
 
-def _get_audio_duration(audio_path: str) -> float:
-    """Get audio duration in seconds."""
+
+def available_cpu_count() -> int:
+    """CPUs this process may run on (respects affinity, unlike os.cpu_count)."""
     try:
-        container = av.open(audio_path)
-        audio_stream = next((s for s in container.streams if s.type == 'audio'), None)
-        if audio_stream and audio_stream.duration and audio_stream.time_base:
-            return float(audio_stream.duration * audio_stream.time_base)
-    except Exception:
-        pass
-    return 0
-
-
-def _convert_to_wav(input_path: str) -> str:
-    """Convert audio to WAV format with mono, 16kHz sample rate using PyAV."""
-    out_fd, out_path = tempfile.mkstemp(suffix=".wav")
-    os.close(out_fd)
-    
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # sched_getaffinity is not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _get_whisper_model(
+    model_size: str,
+    device: str = "cpu",
+    compute_type: str = "int8",
+    cpu_threads: int = 0,
+    num_workers: int = NUM_WORKERS,
+) -> WhisperModel:
+    """
+    Load a WhisperModel once and share it across reruns and sessions.
+    num_workers > 1 lets concurrent sessions transcribe in parallel on the shared model.
+    """
+    return WhisperModel(
+        model_size,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+    )
+
+
+def _read_pcm(input_path: str) -> Optional[np.ndarray]:
+    """Read 16kHz WAV/FLAC directly with soundfile. Returns None if a transcode is needed."""
+    try:
+        if sf.info(input_path).samplerate != SAMPLE_RATE:
+            return None
+        samples, _ = sf.read(input_path, dtype="float32")
+    except RuntimeError:
+        # Unreadable by libsndfile; let PyAV handle it
+        return None
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1, dtype=np.float32)
+    return samples
+
+
+def _decode_to_array(input_path: str) -> np.ndarray:
+    """Decode audio to a mono, 16kHz float32 array (soundfile fast path, else PyAV)."""
+    if input_path.lower().endswith(_SOUNDFILE_EXTS):
+        samples = _read_pcm(input_path)
+        if samples is not None and samples.size:
+            return samples
+
     try:
         container = av.open(input_path)
-        audio_stream = next((s for s in container.streams if s.type == 'audio'), None)
-        
-        if audio_stream is None:
-            raise ValueError("No audio stream found in file")
-        
-        output_container = av.open(out_path, 'w')
-        output_stream = output_container.add_stream('pcm_s16le', rate=16000)
-        
-        # Create resampler to convert to mono, 16kHz
-        resampler = av.AudioResampler(format='s16', layout='mono')
-        
-        frame_count = 0
-        for frame in container.decode(audio_stream):
-            # Resample the frame to mono, 16kHz
-            resampled_frames = resampler.resample(frame)
-            if resampled_frames:
-                for f in resampled_frames:
-                    for packet in output_stream.encode(f):
-                        output_container.mux(packet)
-                    frame_count += 1
-        
-        # Flush remaining packets
-        for packet in output_stream.encode():
-            output_container.mux(packet)
-        
-        output_container.close()
-        
-        if frame_count == 0:
+        try:
+            audio_stream = next((s for s in container.streams if s.type == 'audio'), None)
+
+            if audio_stream is None:
+                raise ValueError("No audio stream found in file")
+
+            # Create resampler to convert to mono, 16kHz
+            resampler = av.AudioResampler(format='s16', layout='mono', rate=SAMPLE_RATE)
+
+            pcm_chunks = []
+            for frame in container.decode(audio_stream):
+                for f in resampler.resample(frame):
+                    pcm_chunks.append(f.to_ndarray().reshape(-1))
+
+            # Flush samples buffered in the resampler
+            for f in resampler.resample(None):
+                pcm_chunks.append(f.to_ndarray().reshape(-1))
+        finally:
+            container.close()
+
+        if not pcm_chunks:
             raise ValueError("No audio frames were processed")
-            
+
     except Exception as e:
-        # Clean up on error
-        try:
-            os.remove(out_path)
-        except Exception:
-            pass
-        raise RuntimeError(f"Failed to convert audio: {e}") from e
-    
-    return out_path
+        raise RuntimeError(f"Failed to decode audio: {e}") from e
+
+    # Concatenate straight into float32 and scale in place, so only the int16
+    # frames and one full-length float32 buffer are ever alive together
+    samples = np.concatenate(pcm_chunks, dtype=np.float32)
+    del pcm_chunks
+    samples /= 32768.0
+    return samples
 
 
-def _chunk_audio(wav_path: str, chunk_duration_seconds: int = 1200) -> list[str]:
+def _chunk_audio(samples: np.ndarray, chunk_duration_seconds: int = 1200) -> list[np.ndarray]:
     """
     Split audio into chunks of specified duration.
     Default: 20 minutes (1200 seconds) per chunk.
-    Returns list of chunk file paths.
+    Returns list of views into `samples`.
     """
-    chunks = []
-    try:
-        container = av.open(wav_path)
-        audio_stream = next((s for s in container.streams if s.type == 'audio'), None)
-        
-        if audio_stream is None:
-            return [wav_path]
-        
-        # Calculate total duration
-        total_duration = _get_audio_duration(wav_path)
-        if total_duration <= chunk_duration_seconds:
-            return [wav_path]
-        
-        num_chunks = int((total_duration / chunk_duration_seconds) + 1)
-        
-        for chunk_idx in range(num_chunks):
-            out_fd, chunk_path = tempfile.mkstemp(suffix=".wav")
-            os.close(out_fd)
-            
-            start_time = chunk_idx * chunk_duration_seconds
-            end_time = min((chunk_idx + 1) * chunk_duration_seconds, total_duration)
-            
-            output_container = av.open(chunk_path, 'w')
-            output_stream = output_container.add_stream('pcm_s16le', rate=16000)
-            
-            resampler = av.AudioResampler(format='s16', layout='mono')
-            
-            for frame in container.decode(audio_stream):
-                if frame.pts is None:
-                    continue
-                frame_time = float(frame.pts * audio_stream.time_base)
-                
-                if frame_time >= end_time:
-                    break
-                if frame_time < start_time:
-                    continue
-                
-                resampled_frames = resampler.resample(frame)
-                if resampled_frames:
-                    for f in resampled_frames:
-                        for packet in output_stream.encode(f):
-                            output_container.mux(packet)
-            
-            for packet in output_stream.encode():
-                output_container.mux(packet)
-            
-            output_container.close()
-            chunks.append(chunk_path)
-        
-        return chunks
-    except Exception as e:
-        # On error, return original file
-        return [wav_path]
+    chunk_len = chunk_duration_seconds * SAMPLE_RATE
+    return [samples[i:i + chunk_len] for i in range(0, len(samples), chunk_len)]
 
 
 def transcribe_audio(
     audio_path: str,
     model_size: str = "small",
     language: Optional[str] = "en",
+    batch_size: int = 16,
+    cpu_threads: Optional[int] = None,
+    share_cores: bool = False,
 ) -> Tuple[str, str]:
     """
     Returns: (transcript_text, detected_language)
     Uses faster-whisper locally (free). Automatically chunks large files.
+    VAD segments are decoded in batches of `batch_size`; pass 1 to decode sequentially.
+    `cpu_threads` defaults to all available CPUs. With `share_cores`, the default is
+    split across the model's workers so concurrent sessions don't oversubscribe the
+    CPUs, but never drops below CTranslate2's own default of 4 threads (or the CPU count).
     """
-    wav_path = _convert_to_wav(audio_path)
-    
-    # Check if chunking is needed (for files > 20 minutes)
-    duration = _get_audio_duration(wav_path)
-    chunk_duration = 1200  # 20 minutes
-    
-    if duration > chunk_duration:
-        # Chunk the audio
-        chunks = _chunk_audio(wav_path, chunk_duration)
-    else:
-        chunks = [wav_path]
+    if cpu_threads is None:
+        cpu_threads = available_cpu_count()
+        if share_cores:
+            cpu_threads = max(min(4, cpu_threads), cpu_threads // NUM_WORKERS)
+
+    # Decode on a worker thread while the model loads; PyAV and CTranslate2
+    # both release the GIL. The model is fetched on the script thread so
+    # st.cache_resource keeps its run context.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        samples_future = executor.submit(_decode_to_array, audio_path)
+        # CPU-only safe defaults. If you have GPU, switch device="cuda".
+        # CTranslate2 has no float16/bfloat16 kernels on CPU, so int8 is the fastest option here.
+        model = _get_whisper_model(
+            model_size, device="cpu", compute_type="int8", cpu_threads=cpu_threads
+        )
+        samples = samples_future.result()
 
-    # CPU-only safe defaults. If you have GPU, switch device="cuda"
-    model = WhisperModel(model_size, device="cpu", compute_type="int8")
+    # Chunk files longer than 20 minutes. The whole file is already in memory;
+    # this only bounds the pipeline's per-call features and VAD buffers
+    chunks = _chunk_audio(samples, chunk_duration_seconds=1200)
 
-    transcript_lines = []
+    if batch_size > 1:
+        pipeline = BatchedInferencePipeline(model=model)
+        batch_kwargs = dict(batch_size=batch_size)
+    else:
+        pipeline = model
+        batch_kwargs = {}
+
+    chunk_texts = []
     detected_lang = "unknown"
     
-    try:
-        for chunk_path in chunks:
-            segments, info = model.transcribe(
-                chunk_path,
-                language=language,
-                vad_filter=True,
-                vad_parameters=dict(min_silence_duration_ms=500),
-            )
-
-            for seg in segments:
-                transcript_lines.append(seg.text.strip())
-            
-            detected_lang = getattr(info, "language", "unknown")
-            
-            # Clean up chunk if it's not the original file
-            if chunk_path != wav_path:
-                try:
-                    os.remove(chunk_path)
-                except Exception:
-                    pass
-    finally:
-        # Clean up WAV conversion
-        try:
-            os.remove(wav_path)
-        except Exception:
-            pass
+    for chunk in chunks:
+        segments, info = pipeline.transcribe(
+            chunk,
+            language=language,
+            vad_filter=True,
+            vad_parameters=dict(min_silence_duration_ms=500),
+            **batch_kwargs,
+        )
 
-    transcript = " ".join([t for t in transcript_lines if t]).strip()
-    detected_lang = getattr(info, "language", "unknown")
+        # Consume the lazy segment generator directly into the join
+        chunk_texts.append(" ".join(t for t in (seg.text.strip() for seg in segments) if t))
+        
+        detected_lang = getattr(info, "language", "unknown")
 
-    try:
-        os.remove(wav_path)
-    except Exception:
-        pass
+    transcript = " ".join(t for t in chunk_texts if t)
 
     return transcript, detected_lang